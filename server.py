@@ -7,12 +7,18 @@ and estimated costs. No dependencies beyond Python stdlib.
 Port: 8766
 """
 
+import functools
+import heapq
 import http.server
 import json
+import multiprocessing
 import os
-import glob
 import socketserver
 import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, parse_qs
 from http import HTTPStatus
@@ -37,39 +43,73 @@ MODEL_PRICING = {
 DEFAULT_PRICING = {'input': 1.00, 'output': 5.00, 'cacheRead': 0.10, 'cacheWrite': 1.00}
 
 
+# Per-model rate rows in (input, output, cacheRead, cacheWrite) order, built
+# once so cost calculation is a single lookup plus tuple unpack.
+_PRICING_FIELDS = ('input', 'output', 'cacheRead', 'cacheWrite')
+_RATES_BY_MODEL = {m: tuple(p[k] for k in _PRICING_FIELDS) for m, p in MODEL_PRICING.items()}
+_DEFAULT_RATES = tuple(DEFAULT_PRICING[k] for k in _PRICING_FIELDS)
+
+
 def _cost(model, usage):
     """Calculate cost for a model's token usage."""
-    rates = MODEL_PRICING.get(model, DEFAULT_PRICING)
-    net_input = max(0, usage['input'] - usage['cacheRead'] - usage['cacheWrite'])
+    return _tokens_cost(model, (usage['input'], usage['output'], usage['cacheRead'], usage['cacheWrite']))
+
+
+def _tokens_cost(model, tokens):
+    """Calculate cost for a (input, output, cacheRead, cacheWrite) token vector."""
+    r_in, r_out, r_read, r_write = _RATES_BY_MODEL.get(model, _DEFAULT_RATES)
+    inp, out, cache_read, cache_write = tokens
+    net_input = max(0, inp - cache_read - cache_write)
     return (
-        net_input * rates['input'] / 1_000_000
-        + usage['output'] * rates['output'] / 1_000_000
-        + usage['cacheRead'] * rates['cacheRead'] / 1_000_000
-        + usage['cacheWrite'] * rates['cacheWrite'] / 1_000_000
-    )
+        net_input * r_in
+        + out * r_out
+        + cache_read * r_read
+        + cache_write * r_write
+    ) / 1_000_000
+
+
+# Project folder names only change meaning when directories are created or
+# renamed, so decoded paths are reused for a minute.
+_PROJECT_PATH_TTL = 60.0
+_PROJECT_PATH_CACHE = {}  # (home, folder_name) -> (resolved_at, display path)
 
 
 def _decode_project_folder(folder_name):
     """Decode Claude Code project folder name to human-readable path."""
     home = os.path.expanduser('~')
+    key = (home, folder_name)
+    now = time.monotonic()
+    cached = _PROJECT_PATH_CACHE.get(key)
+    if cached and now - cached[0] < _PROJECT_PATH_TTL:
+        return cached[1]
+    display = _resolve_project_folder(folder_name, home)
+    _PROJECT_PATH_CACHE[key] = (now, display)
+    return display
+
+
+def _resolve_project_folder(folder_name, home):
+    """Reconstruct the path behind an encoded folder name by matching directory entries."""
     home_encoded = '-' + home.replace('/', '-')[1:]
     if folder_name == home_encoded:
         return '~'
     prefix = home_encoded + '-'
     if folder_name.startswith(prefix):
         remainder = folder_name[len(prefix):]
-        # Try to reconstruct path by probing filesystem
         parts = remainder.split('-')
         best = ''
         path = home
         i = 0
         while i < len(parts):
-            # Try progressively longer segments (handles dirs with hyphens)
+            # One listing per level; try progressively longer segments
+            # against it (handles dirs with hyphens)
+            try:
+                names = set(os.listdir(path))
+            except OSError:
+                names = set()
             for j in range(len(parts), i, -1):
                 candidate = '-'.join(parts[i:j])
-                test_path = os.path.join(path, candidate)
-                if os.path.exists(test_path):
-                    path = test_path
+                if not candidate or candidate in names:
+                    path = os.path.join(path, candidate) if candidate else path
                     best = path
                     i = j
                     break
@@ -81,90 +121,496 @@ def _decode_project_folder(folder_name):
     return folder_name
 
 
-def compute_usage(days=7):
-    """Compute Claude Code usage stats by model and by day."""
-    claude_dir = os.path.expanduser('~/.claude/projects')
-    if not os.path.isdir(claude_dir):
-        return {'byModel': {}, 'byDay': [], 'totalEstimatedCost': 0, 'totalSessions': 0, 'days': days}
+# ── Targeted field probes ────────────────────────────────────────────
+# Assistant lines are dominated by message.content; only a handful of fields
+# are needed, so pull them straight out of the raw bytes. Any line that isn't
+# the plain compact shape falls back to a full json.loads.
+_PROBE_TS = re.compile(rb'"timestamp":"([^"\\]*)"')
+_PROBE_MODEL = re.compile(rb'"model":"([^"\\]*)"')
+_USAGE_KEYS = ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+_PROBE_TOKENS = tuple(re.compile(rb'"' + key.encode() + rb'":(\d+)') for key in _USAGE_KEYS)
+# Past this size a line is mostly tool payload: the probe's several full
+# scans cost more than one json.loads. Crossover measured on real session
+# logs was 3-8 KB depending on how much of the line is escaped tool input.
+_PROBE_MAX_LEN = 4096
+# The usage block as the Claude Code client writes it: one scan yields all
+# four counters. Other key orders fall back to the per-key patterns.
+_PROBE_USAGE_BLOCK = re.compile(
+    rb'"usage":\{"input_tokens":(\d+),"cache_creation_input_tokens":(\d+),'
+    rb'"cache_read_input_tokens":(\d+),(?:"cache_creation":\{[^{}]*\},)?"output_tokens":(\d+)'
+)
+
+
+def _probe_usage(line):
+    """Extract (timestamp, model, tokens) from an assistant line without parsing it.
+
+    tokens is (input, output, cacheRead, cacheWrite), the slot order used by
+    the per-file summaries.
+
+    Returns None when any field is ambiguous or missing so the caller can fall
+    back to json.loads.
+    """
+    # One record per line: a crash-truncated record with the next one
+    # appended after it repeats the opening key and isn't valid JSON, so
+    # leave it for json.loads to reject.
+    head_end = line.find(b'":')
+    if line[:2] != b'{"' or line[-1:] != b'}' or head_end < 0 or line.find(line[:head_end + 2], 1) >= 0:
+        return None
+    # Exactly one message/usage/assistant marker means they belong to the
+    # top-level message; nested agent progress lines repeat them.
+    if (line.count(b'"usage":{') != 1 or line.count(b'"message":{') != 1
+            or line.count(b'"type":"assistant"') != 1):
+        return None
+    ts = _PROBE_TS.findall(line)
+    model = _PROBE_MODEL.findall(line)
+    if len(ts) != 1 or len(model) != 1:
+        return None
+    block = _PROBE_USAGE_BLOCK.search(line)
+    if block is not None:
+        inp, cache_write, cache_read, out = block.groups()
+        return ts[0].decode(), model[0].decode(), (int(inp), int(out), int(cache_read), int(cache_write))
+    tokens = []
+    for pattern in _PROBE_TOKENS:
+        found = pattern.findall(line)
+        if len(found) > 1:
+            return None
+        tokens.append(int(found[0]) if found else 0)
+    return ts[0].decode(), model[0].decode(), tuple(tokens)
+
+
+def _fold_by_model(by_day, by_model):
+    """Add every per-day model bucket into the matching by_model totals.
+
+    The parse loops only accumulate per (day, model); overall totals are a
+    sum over that much smaller table rather than a second update per entry.
+    """
+    for models in by_day.values():
+        for model, u in models.items():
+            total = by_model[model]
+            total[0] += u[0]
+            total[1] += u[1]
+            total[2] += u[2]
+            total[3] += u[3]
+
+
+def _usage_dict(tokens):
+    """Expand an [input, output, cacheRead, cacheWrite] vector to the API schema."""
+    return {'input': tokens[0], 'output': tokens[1], 'cacheRead': tokens[2], 'cacheWrite': tokens[3]}
+
+
+# ── Session file walk ────────────────────────────────────────────────
+# /api/usage, /api/sessions and /api/hourly all walk the same tree, and the
+# dashboard polls them back to back; share one scandir walk for a few seconds.
+_WALK_TTL = 5.0
+_WALK_CACHE = {}  # claude_dir -> (walked_at, [(project_folder, path, mtime, size), ...])
+
+
+def _list_jsonl(claude_dir):
+    """Return (project_folder, path, mtime, size) for every session file under claude_dir."""
+    now = time.monotonic()
+    cached = _WALK_CACHE.get(claude_dir)
+    if cached and now - cached[0] < _WALK_TTL:
+        return cached[1]
+    files = []
+    try:
+        with os.scandir(claude_dir) as projects:
+            for project in projects:
+                try:
+                    if not project.is_dir():
+                        continue
+                    with os.scandir(project.path) as entries:
+                        for entry in entries:
+                            name = entry.name
+                            if name.endswith('.jsonl') and not name.startswith('.') and entry.is_file():
+                                st = entry.stat()
+                                files.append((project.name, entry.path, st.st_mtime, st.st_size))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    _WALK_CACHE[claude_dir] = (now, files)
+    _prune_file_cache(claude_dir, files)
+    return files
+
+
+def _iter_recent_jsonl(claude_dir, cutoff_ts=None):
+    """Yield (project_folder, path, mtime, size) for session files modified since cutoff_ts."""
+    for item in _list_jsonl(claude_dir):
+        if cutoff_ts is None or item[2] >= cutoff_ts:
+            yield item
+
+
+def _tree_signature(claude_dir):
+    """Cheap change detector for the session tree: file count, newest mtime, total size."""
+    files = _list_jsonl(claude_dir)
+    return (
+        time.strftime('%Y-%m-%d'),
+        len(files),
+        max((f[2] for f in files), default=0),
+        sum(f[3] for f in files),
+    )
+
+
+# ── Per-file parse cache ─────────────────────────────────────────────
+# Session files are append-only, so each one is summarized once and then only
+# the bytes appended since the last request are parsed. Summaries are treated
+# as immutable snapshots: an update builds a copy and swaps it in, so
+# concurrent request threads never see (or double-apply) a half-parsed tail.
+_FILE_CACHE = {}  # path -> summary, see _summarize_jsonl
+_PARALLEL_MIN_FILES = 16
+_PREFETCH_LOCK = threading.Lock()
+
+
+def _prune_file_cache(claude_dir, files):
+    """Drop summaries for session files under claude_dir that no longer exist."""
+    live = {f[1] for f in files}
+    prefix = claude_dir + os.sep
+    # Snapshot the keys: other request threads insert while this one prunes.
+    for path in [p for p in list(_FILE_CACHE) if p.startswith(prefix) and p not in live]:
+        _FILE_CACHE.pop(path, None)
+
+
+# Token vectors are [input, output, cacheRead, cacheWrite] lists; the API's
+# dict schema is only built when a response is assembled.
+def _zero_tokens():
+    return [0, 0, 0, 0]
+
+
+def _new_day():
+    return defaultdict(_zero_tokens)
+
+
+def _new_summary():
+    return {
+        'mtime': None, 'size': 0, 'offset': 0,
+        'days': defaultdict(_new_day),      # timestamp date ('' if undated) -> {model: tokens}
+        'models': defaultdict(_zero_tokens),  # model -> tokens over the whole file
+        'first_ts': None, 'last_ts': None, 'msg_count': 0,
+        'primary_model': None, 'primary_total': 0,  # model with most input+output so far
+    }
+
+
+def _copy_summary(summary):
+    copy = dict(summary)
+    copy['days'] = defaultdict(_new_day, {
+        d: defaultdict(_zero_tokens, {m: list(u) for m, u in models.items()})
+        for d, models in summary['days'].items()
+    })
+    copy['models'] = defaultdict(_zero_tokens, {m: list(u) for m, u in summary['models'].items()})
+    return copy
+
+
+_READ_CHUNK = 8 << 20
+
+
+def _iter_records(path, offset, size):
+    """Yield (line, end_offset) for each JSONL record in path[offset:size].
+
+    Reads in large chunks and splits on newlines instead of iterating a
+    buffered file object. An unterminated last line is only yielded once it
+    parses as JSON, i.e. the writer has finished it.
+    """
+    pending = b''
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        remaining = size - offset
+        while remaining > 0:
+            chunk = f.read(min(_READ_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            lines = (pending + chunk if pending else chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                offset += len(line) + 1
+                yield line, offset
+    if pending:
+        try:
+            json.loads(pending)
+        except ValueError:
+            return
+        yield pending, offset + len(pending)
 
-    cutoff = datetime.now() - timedelta(days=days)
-    cutoff_str = cutoff.strftime('%Y-%m-%d')
-    by_model = {}
-    by_day = {}
-    sessions_by_day = {}
 
-    for project_folder in os.listdir(claude_dir):
-        project_path = os.path.join(claude_dir, project_folder)
-        if not os.path.isdir(project_path):
+def _is_fresh(cached, mtime, size):
+    """Whether a cached summary still covers a file with this mtime and size."""
+    return cached is not None and cached['mtime'] == mtime and cached['size'] == size
+
+
+def _summarize_jsonl(path, mtime, size):
+    """Return the cached usage/session summary for one JSONL file.
+
+    Unchanged files are served from the cache; a file that grew is parsed from
+    the last consumed offset, anything else is parsed from the start.
+    """
+    cached = _FILE_CACHE.get(path)
+    if _is_fresh(cached, mtime, size):
+        return cached
+    summary = _parse_jsonl(path, mtime, size, cached)
+    _FILE_CACHE[path] = summary
+    return summary
+
+
+def _parse_jsonl(path, mtime, size, cached=None):
+    """Parse the part of path not covered by cached and return the new summary."""
+    if cached is not None and size > cached['size']:
+        summary = _copy_summary(cached)
+    else:
+        summary = _new_summary()
+
+    days = summary['days']
+    models = summary['models']
+    first_ts = summary['first_ts']
+    last_ts = summary['last_ts']
+    msg_count = summary['msg_count']
+    primary_model = summary['primary_model']
+    primary_total = summary['primary_total']
+    offset = summary['offset']
+
+    for line, offset in _iter_records(path, offset, size):
+        # Byte pre-filter: only parse for the fields this line could
+        # actually supply. Usage is read from message.usage, and only
+        # user/assistant entries count as messages. Blank lines carry none
+        # of the markers, so they need no separate strip() check.
+        has_ts = b'"timestamp"' in line
+        has_usage = b'"usage"' in line and b'"message"' in line
+        has_type = b'"type"' in line and (b'"user"' in line or b'"assistant"' in line)
+        if not has_ts and not has_usage and not has_type:
             continue
-        for jsonl_file in glob.glob(os.path.join(project_path, '*.jsonl')):
+        probed = _probe_usage(line) if has_usage and len(line) <= _PROBE_MAX_LEN else None
+        if probed is not None:
+            ts, model, tokens = probed
+            msg_count += 1
+        else:
             try:
-                mtime = os.path.getmtime(jsonl_file)
-                if datetime.fromtimestamp(mtime) < cutoff:
-                    continue
-                session_day = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
-                sessions_by_day[session_day] = sessions_by_day.get(session_day, 0) + 1
-
-                with open(jsonl_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or '"usage"' not in line:
-                            continue
-                        try:
-                            entry = json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
-                        ts = entry.get('timestamp', '')
-                        if ts and ts[:10] < cutoff_str:
-                            continue
-                        msg = entry.get('message', {})
-                        if not isinstance(msg, dict):
-                            continue
-                        usage = msg.get('usage')
-                        if not usage:
-                            continue
-                        model = entry.get('model') or msg.get('model', 'unknown')
-                        if model.startswith('<'):
-                            continue
-                        day_str = ts[:10] if ts else session_day
-
-                        for bucket in (by_model, by_day.setdefault(day_str, {})):
-                            if model not in bucket:
-                                bucket[model] = {'input': 0, 'output': 0, 'cacheRead': 0, 'cacheWrite': 0}
-                        by_model[model]['input'] += usage.get('input_tokens', 0)
-                        by_model[model]['output'] += usage.get('output_tokens', 0)
-                        by_model[model]['cacheRead'] += usage.get('cache_read_input_tokens', 0)
-                        by_model[model]['cacheWrite'] += usage.get('cache_creation_input_tokens', 0)
-                        by_day[day_str][model]['input'] += usage.get('input_tokens', 0)
-                        by_day[day_str][model]['output'] += usage.get('output_tokens', 0)
-                        by_day[day_str][model]['cacheRead'] += usage.get('cache_read_input_tokens', 0)
-                        by_day[day_str][model]['cacheWrite'] += usage.get('cache_creation_input_tokens', 0)
-            except Exception:
+                entry = json.loads(line)
+            except ValueError:
                 continue
+            if not isinstance(entry, dict):
+                # Only this record is dropped; the rest of the file still counts.
+                continue
+            ts = entry.get('timestamp', '') if has_ts else ''
+            if has_type and entry.get('type') in ('user', 'assistant'):
+                msg_count += 1
+        if ts:
+            if not first_ts:
+                first_ts = ts
+            last_ts = ts
+        if probed is None:
+            if not has_usage:
+                continue
+            msg = entry.get('message', {})
+            if not isinstance(msg, dict):
+                continue
+            usage = msg.get('usage')
+            if not usage:
+                continue
+            model = entry.get('model') or msg.get('model', 'unknown')
+            tokens = [usage.get(key, 0) for key in _USAGE_KEYS]
+        if model.startswith('<'):
+            continue
 
-    # Filter empty/synthetic models
-    by_model = {m: u for m, u in by_model.items() if (u['input'] + u['output']) > 0}
-
-    # Calculate costs
-    for model, usage in by_model.items():
-        usage['estimatedCost'] = round(_cost(model, usage), 4)
+        inp, out, cache_read, cache_write = tokens
+        day_vec = days[ts[:10] if ts else ''][model]
+        day_vec[0] += inp
+        day_vec[1] += out
+        day_vec[2] += cache_read
+        day_vec[3] += cache_write
+        model_vec = models[model]
+        model_vec[0] += inp
+        model_vec[1] += out
+        model_vec[2] += cache_read
+        model_vec[3] += cache_write
+        # Totals only grow, so the running leader is the final leader.
+        model_total = model_vec[0] + model_vec[1]
+        if model_total > primary_total:
+            primary_model, primary_total = model, model_total
+
+    summary.update(mtime=mtime, size=size, offset=offset,
+                   first_ts=first_ts, last_ts=last_ts, msg_count=msg_count,
+                   primary_model=primary_model, primary_total=primary_total)
+    return summary
+
+
+def _parse_jsonl_quietly(path, mtime, size, cached):
+    """Worker-process wrapper: a failing file is left for the serial path."""
+    try:
+        return _parse_jsonl(path, mtime, size, cached)
+    except Exception:
+        return None
+
+
+def _prefetch_summaries(files):
+    """Parse stale session files in worker processes when there are many of them.
+
+    Steady-state requests only touch a few appended files and stay serial;
+    this is for the first request after startup over a long history, where
+    parsing is CPU-bound and independent per file.
+    """
+    workers = os.cpu_count() or 1
+    if workers < 2 or len(files) < _PARALLEL_MIN_FILES:
+        return
+    with _PREFETCH_LOCK:
+        stale = []
+        for _, path, mtime, size in files:
+            cached = _FILE_CACHE.get(path)
+            if not _is_fresh(cached, mtime, size):
+                stale.append((path, mtime, size, cached))
+        if len(stale) < _PARALLEL_MIN_FILES:
+            return
+        try:
+            # spawn rather than fork: request handler threads may be running
+            with ProcessPoolExecutor(max_workers=min(workers, len(stale)),
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                results = list(pool.map(_parse_jsonl_quietly, *zip(*stale), chunksize=8))
+        except Exception:
+            return
+        for (path, _, _, _), summary in zip(stale, results):
+            if summary is not None:
+                _FILE_CACHE[path] = summary
+
+
+def _add_day_usage(by_day, by_model, day_str, models):
+    """Merge one file's {model: tokens} for a day into the request aggregates.
+
+    Aggregates stay [input, output, cacheRead, cacheWrite] vectors until
+    _usage_result expands them to the response schema.
+    """
+    bucket = by_day.setdefault(day_str, {})
+    for model, u in models.items():
+        day_usage = bucket.get(model)
+        if day_usage is None:
+            day_usage = bucket[model] = [0, 0, 0, 0]
+            if model not in by_model:
+                by_model[model] = [0, 0, 0, 0]
+        day_usage[0] += u[0]
+        day_usage[1] += u[1]
+        day_usage[2] += u[2]
+        day_usage[3] += u[3]
+
+
+def _usage_result(days, by_model, by_day, sessions_by_day):
+    """Assemble a usage response from per-request by_model/by_day aggregates."""
+    _fold_by_model(by_day, by_model)
+
+    # Filter empty/synthetic models and price the rest in the same pass.
+    # Rates apply to the model totals (net input is clamped once per model),
+    # so cost can't be accumulated per entry without changing the figures.
+    priced = {}
+    total_cost = 0
+    for model, u in by_model.items():
+        if u[0] + u[1] > 0:
+            usage = priced[model] = _usage_dict(u)
+            usage['estimatedCost'] = round(_tokens_cost(model, u), 4)
+            total_cost += usage['estimatedCost']
 
     by_day_list = sorted(
-        [{'date': d, 'models': {m: u for m, u in models.items() if (u['input'] + u['output']) > 0},
+        [{'date': d, 'models': {m: _usage_dict(u) for m, u in models.items() if (u[0] + u[1]) > 0},
           'sessions': sessions_by_day.get(d, 0)}
          for d, models in by_day.items() if models],
         key=lambda x: x['date'], reverse=True
     )
 
     return {
-        'byModel': by_model,
+        'byModel': priced,
         'byDay': by_day_list,
-        'totalEstimatedCost': round(sum(u['estimatedCost'] for u in by_model.values()), 2),
+        'totalEstimatedCost': round(total_cost, 2),
         'totalSessions': sum(sessions_by_day.values()),
         'days': days,
     }
 
 
+def _session_row(jsonl_file, project_display, mtime, summary):
+    """Build one per-session cost row from a file summary, or None without usage."""
+    # The summary tracks the leading model while parsing; none means no model
+    # had any input or output.
+    primary_model = summary['primary_model']
+    if primary_model is None:
+        return None
+
+    total_cost = total_input = total_output = 0
+    for model, u in summary['models'].items():
+        if u[0] + u[1] > 0:
+            total_cost += _tokens_cost(model, u)
+            total_input += u[0]
+            total_output += u[1]
+
+    first_ts = summary['first_ts']
+    last_ts = summary['last_ts']
+
+    return {
+        'sessionId': os.path.basename(jsonl_file).replace('.jsonl', ''),
+        'project': project_display,
+        'date': (last_ts or first_ts or datetime.fromtimestamp(mtime).isoformat())[:10],
+        'primaryModel': primary_model,
+        'totalInput': total_input,
+        'totalOutput': total_output,
+        'msgCount': summary['msg_count'],
+        'estimatedCost': round(total_cost, 4),
+        'mtime': mtime,
+    }
+
+
+# ── Shared usage/sessions pass ───────────────────────────────────────
+# /api/usage and /api/sessions cover the same files for a given window, so
+# one walk feeds both and the result is shared for a few seconds.
+_AGGREGATE_TTL = 5.0
+
+
+def _compute_all(claude_dir, days):
+    """Return (usage, sessions) for the last `days` days from one pass over the files.
+
+    sessions is every session row in walk order; callers pick the newest.
+    Both are shared between callers and must not be mutated.
+    """
+    bucket = int(time.monotonic() // _AGGREGATE_TTL)
+    return _compute_all_cached(claude_dir, days, bucket, _tree_signature(claude_dir))
+
+
+@functools.lru_cache(maxsize=16)
+def _compute_all_cached(claude_dir, days, bucket, signature):
+    """Body of _compute_all; bucket and signature only key the cache."""
+    cutoff = datetime.now() - timedelta(days=days)
+    cutoff_str = cutoff.strftime('%Y-%m-%d')
+    by_model = {}
+    by_day = {}
+    sessions_by_day = {}
+    sessions = []
+    project_displays = {}
+
+    files = list(_iter_recent_jsonl(claude_dir, cutoff.timestamp()))
+    _prefetch_summaries(files)
+    for project_folder, jsonl_file, mtime, size in files:
+        try:
+            session_day = time.strftime('%Y-%m-%d', time.localtime(mtime))
+            sessions_by_day[session_day] = sessions_by_day.get(session_day, 0) + 1
+            summary = _summarize_jsonl(jsonl_file, mtime, size)
+        except Exception:
+            continue
+        for day, models in summary['days'].items():
+            if day and day < cutoff_str:
+                continue
+            _add_day_usage(by_day, by_model, day or session_day, models)
+
+        if project_folder not in project_displays:
+            project_displays[project_folder] = _decode_project_folder(project_folder)
+        row = _session_row(jsonl_file, project_displays[project_folder], mtime, summary)
+        if row is not None:
+            sessions.append(row)
+
+    usage = _usage_result(days, by_model, by_day, sessions_by_day)
+    return usage, sessions
+
+
+def compute_usage(days=7):
+    """Compute Claude Code usage stats by model and by day."""
+    claude_dir = os.path.expanduser('~/.claude/projects')
+    if not os.path.isdir(claude_dir):
+        return {'byModel': {}, 'byDay': [], 'totalEstimatedCost': 0, 'totalSessions': 0, 'days': days}
+    usage, _ = _compute_all(claude_dir, days)
+    return dict(usage)
+
+
 def compute_usage_comparison(days=7):
     """Compute usage for current and previous period for comparison."""
     # Current period
@@ -197,80 +643,23 @@ def compute_usage_with_offset(days=7, offset_days=0):
     by_day = {}
     sessions_by_day = {}
 
-    for project_folder in os.listdir(claude_dir):
-        project_path = os.path.join(claude_dir, project_folder)
-        if not os.path.isdir(project_path):
+    end_ts = end_cutoff.timestamp()
+    files = [f for f in _iter_recent_jsonl(claude_dir, start_cutoff.timestamp()) if f[2] <= end_ts]
+    _prefetch_summaries(files)
+    for project_folder, jsonl_file, mtime, size in files:
+        try:
+            session_day = time.strftime('%Y-%m-%d', time.localtime(mtime))
+            if session_day >= start_str and session_day < cutoff_str:
+                sessions_by_day[session_day] = sessions_by_day.get(session_day, 0) + 1
+            summary = _summarize_jsonl(jsonl_file, mtime, size)
+        except Exception:
             continue
-        for jsonl_file in glob.glob(os.path.join(project_path, '*.jsonl')):
-            try:
-                mtime = os.path.getmtime(jsonl_file)
-                if datetime.fromtimestamp(mtime) < start_cutoff or datetime.fromtimestamp(mtime) > end_cutoff:
-                    continue
-                session_day = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
-                if session_day >= start_str and session_day < cutoff_str:
-                    sessions_by_day[session_day] = sessions_by_day.get(session_day, 0) + 1
-
-                with open(jsonl_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or '"usage"' not in line:
-                            continue
-                        try:
-                            entry = json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
-                        ts = entry.get('timestamp', '')
-                        if ts:
-                            ts_date = ts[:10]
-                            if ts_date < start_str or ts_date >= cutoff_str:
-                                continue
-                        else:
-                            continue
-                        msg = entry.get('message', {})
-                        if not isinstance(msg, dict):
-                            continue
-                        usage = msg.get('usage')
-                        if not usage:
-                            continue
-                        model = entry.get('model') or msg.get('model', 'unknown')
-                        if model.startswith('<'):
-                            continue
-                        day_str = ts[:10] if ts else session_day
-                        if day_str < start_str or day_str >= cutoff_str:
-                            continue
-
-                        for bucket in (by_model, by_day.setdefault(day_str, {})):
-                            if model not in bucket:
-                                bucket[model] = {'input': 0, 'output': 0, 'cacheRead': 0, 'cacheWrite': 0}
-                        by_model[model]['input'] += usage.get('input_tokens', 0)
-                        by_model[model]['output'] += usage.get('output_tokens', 0)
-                        by_model[model]['cacheRead'] += usage.get('cache_read_input_tokens', 0)
-                        by_model[model]['cacheWrite'] += usage.get('cache_creation_input_tokens', 0)
-                        by_day[day_str][model]['input'] += usage.get('input_tokens', 0)
-                        by_day[day_str][model]['output'] += usage.get('output_tokens', 0)
-                        by_day[day_str][model]['cacheRead'] += usage.get('cache_read_input_tokens', 0)
-                        by_day[day_str][model]['cacheWrite'] += usage.get('cache_creation_input_tokens', 0)
-            except Exception:
+        for day, models in summary['days'].items():
+            if not day or day < start_str or day >= cutoff_str:
                 continue
+            _add_day_usage(by_day, by_model, day, models)
 
-    by_model = {m: u for m, u in by_model.items() if (u['input'] + u['output']) > 0}
-    for model, usage in by_model.items():
-        usage['estimatedCost'] = round(_cost(model, usage), 4)
-
-    by_day_list = sorted(
-        [{'date': d, 'models': {m: u for m, u in models.items() if (u['input'] + u['output']) > 0},
-          'sessions': sessions_by_day.get(d, 0)}
-         for d, models in by_day.items() if models],
-        key=lambda x: x['date'], reverse=True
-    )
-
-    return {
-        'byModel': by_model,
-        'byDay': by_day_list,
-        'totalEstimatedCost': round(sum(u['estimatedCost'] for u in by_model.values()), 2),
-        'totalSessions': sum(sessions_by_day.values()),
-        'days': days,
-    }
+    return _usage_result(days, by_model, by_day, sessions_by_day)
 
 
 def compute_sessions(days=7, limit=50):
@@ -278,90 +667,9 @@ def compute_sessions(days=7, limit=50):
     claude_dir = os.path.expanduser('~/.claude/projects')
     if not os.path.isdir(claude_dir):
         return {'sessions': [], 'total': 0, 'days': days}
-
-    cutoff = datetime.now() - timedelta(days=days)
-    sessions = []
-
-    for project_folder in os.listdir(claude_dir):
-        project_path = os.path.join(claude_dir, project_folder)
-        if not os.path.isdir(project_path):
-            continue
-        project_display = _decode_project_folder(project_folder)
-
-        for jsonl_file in glob.glob(os.path.join(project_path, '*.jsonl')):
-            try:
-                mtime = os.path.getmtime(jsonl_file)
-                if datetime.fromtimestamp(mtime) < cutoff:
-                    continue
-                session_id = os.path.basename(jsonl_file).replace('.jsonl', '')
-                by_model = {}
-                first_ts = last_ts = None
-                msg_count = 0
-
-                with open(jsonl_file, 'r') as f:
-                    for line in f:
-                        if not line.strip():
-                            continue
-                        has_ts = '"timestamp"' in line
-                        has_usage = '"usage"' in line
-                        has_type = '"type"' in line
-                        if not has_ts and not has_usage and not has_type:
-                            continue
-                        try:
-                            entry = json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
-                        if has_ts:
-                            ts = entry.get('timestamp', '')
-                            if ts:
-                                if not first_ts:
-                                    first_ts = ts
-                                last_ts = ts
-                        if has_type and entry.get('type') in ('user', 'assistant'):
-                            msg_count += 1
-                        if not has_usage:
-                            continue
-                        msg = entry.get('message', {})
-                        if not isinstance(msg, dict):
-                            continue
-                        usage = msg.get('usage')
-                        if not usage:
-                            continue
-                        model = entry.get('model') or msg.get('model', 'unknown')
-                        if model.startswith('<'):
-                            continue
-                        if model not in by_model:
-                            by_model[model] = {'input': 0, 'output': 0, 'cacheRead': 0, 'cacheWrite': 0}
-                        by_model[model]['input'] += usage.get('input_tokens', 0)
-                        by_model[model]['output'] += usage.get('output_tokens', 0)
-                        by_model[model]['cacheRead'] += usage.get('cache_read_input_tokens', 0)
-                        by_model[model]['cacheWrite'] += usage.get('cache_creation_input_tokens', 0)
-
-                by_model = {m: u for m, u in by_model.items() if (u['input'] + u['output']) > 0}
-                if not by_model:
-                    continue
-
-                total_cost = sum(_cost(m, u) for m, u in by_model.items())
-                total_input = sum(u['input'] for u in by_model.values())
-                total_output = sum(u['output'] for u in by_model.values())
-                primary_model = max(by_model, key=lambda m: by_model[m]['input'] + by_model[m]['output'])
-
-                sessions.append({
-                    'sessionId': session_id,
-                    'project': project_display,
-                    'date': (last_ts or first_ts or datetime.fromtimestamp(mtime).isoformat())[:10],
-                    'primaryModel': primary_model,
-                    'totalInput': total_input,
-                    'totalOutput': total_output,
-                    'msgCount': msg_count,
-                    'estimatedCost': round(total_cost, 4),
-                    'mtime': mtime,
-                })
-            except Exception:
-                continue
-
-    sessions.sort(key=lambda s: s['mtime'], reverse=True)
-    return {'sessions': sessions[:limit], 'total': len(sessions), 'days': days}
+    _, sessions = _compute_all(claude_dir, days)
+    top = heapq.nlargest(limit, sessions, key=lambda s: s['mtime'])
+    return {'sessions': top, 'total': len(sessions), 'days': days}
 
 
 def compute_hourly_activity(days=7):
@@ -375,36 +683,60 @@ def compute_hourly_activity(days=7):
     by_hour = [0] * 24
     by_dow = [0] * 7  # 0=Sunday
 
-    for project_folder in os.listdir(claude_dir):
-        project_path = os.path.join(claude_dir, project_folder)
-        if not os.path.isdir(project_path):
-            continue
-
-        for jsonl_file in glob.glob(os.path.join(project_path, '*.jsonl')):
-            try:
-                with open(jsonl_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line or '"timestamp"' not in line:
-                            continue
+    for project_folder, jsonl_file, mtime, size in _iter_recent_jsonl(claude_dir):
+        try:
+            with open(jsonl_file, 'rb') as f:
+                for line in f:
+                    # json.loads ignores the trailing newline; no strip() copy.
+                    if b'"timestamp"' not in line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    ts = entry.get('timestamp', '')
+                    if ts and ts[:10] >= cutoff_str:
                         try:
-                            entry = json.loads(line)
-                        except json.JSONDecodeError:
+                            dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+                            by_hour[dt.hour] += 1
+                            by_dow[dt.weekday()] += 1
+                        except Exception:
                             continue
-                        ts = entry.get('timestamp', '')
-                        if ts and ts[:10] >= cutoff_str:
-                            try:
-                                dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                                by_hour[dt.hour] += 1
-                                by_dow[dt.weekday()] += 1
-                            except Exception:
-                                continue
-            except Exception:
-                continue
+        except Exception:
+            continue
 
     return {'byHour': by_hour, 'byDayOfWeek': by_dow, 'days': days}
 
 
+# ── Response cache ───────────────────────────────────────────────────
+# The dashboard polls the same endpoints repeatedly. Encoded bodies are
+# reused while the session tree signature is unchanged; the TTL bounds how
+# far the rolling mtime cutoff can drift before a file ages out of a window.
+_RESP_TTL = 30.0
+_RESP_CACHE_MAX = 64
+_RESP_CACHE = {}  # (compute fn name, args) -> (computed_at, signature, body)
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+def _encode_json(data):
+    return _JSON_ENCODER.encode(data).encode('ascii')
+
+
+def _cached_response(compute, *args):
+    """Return compute(*args) encoded as JSON, reusing the body while nothing changed."""
+    key = (compute.__name__, args)
+    signature = _tree_signature(os.path.expanduser('~/.claude/projects'))
+    now = time.monotonic()
+    cached = _RESP_CACHE.get(key)
+    if cached and cached[1] == signature and now - cached[0] < _RESP_TTL:
+        return cached[2]
+    body = _encode_json(compute(*args))
+    if len(_RESP_CACHE) >= _RESP_CACHE_MAX:
+        _RESP_CACHE.clear()
+    _RESP_CACHE[key] = (now, signature, body)
+    return body
+
+
 class Handler(http.server.SimpleHTTPRequestHandler):
     def log_message(self, fmt, *args):
         pass  # Silence request logs
@@ -415,17 +747,17 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 
         if parsed.path == '/api/usage':
             days = int(params.get('days', ['7'])[0])
-            self._json(compute_usage(days))
+            self._send_json(_cached_response(compute_usage, days))
         elif parsed.path == '/api/usage/compare':
             days = int(params.get('days', ['7'])[0])
-            self._json(compute_usage_comparison(days))
+            self._send_json(_cached_response(compute_usage_comparison, days))
         elif parsed.path == '/api/sessions':
             days = int(params.get('days', ['7'])[0])
             limit = int(params.get('limit', ['50'])[0])
-            self._json(compute_sessions(days, limit))
+            self._send_json(_cached_response(compute_sessions, days, limit))
         elif parsed.path == '/api/hourly':
             days = int(params.get('days', ['7'])[0])
-            self._json(compute_hourly_activity(days))
+            self._send_json(_cached_response(compute_hourly_activity, days))
         elif parsed.path in ('/', '/index.html'):
             self._serve_file('index.html')
         elif parsed.path == '/manifest.json':
@@ -437,12 +769,20 @@ class Handler(http.server.SimpleHTTPRequestHandler):
         else:
             self.send_error(404)
 
+    _JSON_HEADERS = (
+        ('Content-Type', 'application/json'),
+        ('Access-Control-Allow-Origin', '*'),
+        ('Cache-Control', 'no-cache'),
+    )
+
     def _json(self, data):
-        body = json.dumps(data).encode()
+        self._send_json(_encode_json(data))
+
+    def _send_json(self, body):
         self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-cache')
+        for name, value in self._JSON_HEADERS:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
@@ -5,20 +5,54 @@ import os
 import sys
 import json
 import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
 # Import the module under test
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from server import (
+    Handler,
+    _cached_response,
     _cost,
     _decode_project_folder,
+    _probe_usage,
     compute_usage,
     compute_sessions,
     MODEL_PRICING,
+    DEFAULT_PRICING,
+    _RATES_BY_MODEL,
+    _DEFAULT_RATES,
+    _WALK_CACHE,
+    _list_jsonl,
+    _summarize_jsonl,
+    _FILE_CACHE,
+    _parse_jsonl,
+    _prefetch_summaries,
+    _prune_file_cache,
 )
 
 
+@contextmanager
+def _claude_home():
+    """Point HOME at a temp dir with an empty ~/.claude/projects; yields the projects dir."""
+    with tempfile.TemporaryDirectory() as home:
+        projects = os.path.join(home, '.claude', 'projects')
+        os.makedirs(projects)
+        with patch.dict(os.environ, {'HOME': home}):
+            yield projects
+
+
+def _write_session(projects, folder, name, lines):
+    """Write a session JSONL file (list of bytes lines) and return its path."""
+    os.makedirs(os.path.join(projects, folder), exist_ok=True)
+    path = os.path.join(projects, folder, name + '.jsonl')
+    with open(path, 'wb') as f:
+        f.write(b''.join(line + b'\n' for line in lines))
+    return path
+
+
 class TestCostCalculation:
     """Tests for _cost() function."""
 
@@ -90,14 +124,24 @@ class TestProjectFolderDecoding:
         result = _decode_project_folder('-home-asus')
         assert result == '~'
 
-    @patch('os.path.exists')
-    def test_simple_subfolder(self, mock_exists):
-        """Test decoding a simple subfolder."""
-        mock_exists.return_value = True
-        with patch('os.path.join', side_effect=lambda *args: '/'.join(args)):
-            result = _decode_project_folder('-home-asus-AI-projects')
-            # Should decode to ~/AI (if the path exists)
-            # The function tries to reconstruct, results vary based on filesystem
+    def test_simple_subfolder(self):
+        """Test decoding nested and hyphenated subfolders."""
+        with tempfile.TemporaryDirectory() as home:
+            os.makedirs(os.path.join(home, 'AI', 'my-proj'))
+            encoded = '-' + home.replace('/', '-')[1:]
+            with patch.dict(os.environ, {'HOME': home}):
+                assert _decode_project_folder(encoded + '-AI-my-proj') == '~/AI/my-proj'
+                assert _decode_project_folder(encoded + '-AI-gone-dir') == '~/AI/gone-dir'
+
+    def test_decoded_paths_are_cached(self):
+        """Test that repeat lookups don't touch the filesystem again."""
+        with tempfile.TemporaryDirectory() as home:
+            os.makedirs(os.path.join(home, 'proj'))
+            encoded = '-' + home.replace('/', '-')[1:] + '-proj'
+            with patch.dict(os.environ, {'HOME': home}):
+                assert _decode_project_folder(encoded) == '~/proj'
+                with patch('os.listdir', side_effect=AssertionError('probed')):
+                    assert _decode_project_folder(encoded) == '~/proj'
 
     def test_unknown_folder_returns_unchanged(self):
         """Test that unknown folders return encoded form."""
@@ -106,6 +150,263 @@ class TestProjectFolderDecoding:
         assert result == 'some-random-folder'
 
 
+def _assistant_line(**usage):
+    """Build a compact assistant JSONL line as written by Claude Code."""
+    entry = {
+        'parentUuid': 'abc',
+        'message': {
+            'id': 'msg_1', 'type': 'message', 'role': 'assistant', 'model': 'claude-sonnet-4-6',
+            'content': [{'type': 'text', 'text': 'hello "model": "x"'}],
+            'usage': dict({'input_tokens': 10, 'cache_creation_input_tokens': 20,
+                           'cache_read_input_tokens': 30,
+                           'cache_creation': {'ephemeral_5m_input_tokens': 20},
+                           'output_tokens': 40}, **usage),
+        },
+        'type': 'assistant',
+        'timestamp': '2026-01-02T03:04:05.000Z',
+    }
+    return json.dumps(entry, separators=(',', ':')).encode()
+
+
+class TestUsageProbe:
+    """Tests for _probe_usage()."""
+
+    def test_probe_matches_full_parse(self):
+        """Test that the byte probe agrees with a full json.loads."""
+        line = _assistant_line()
+        probed = _probe_usage(line)
+        assert probed == ('2026-01-02T03:04:05.000Z', 'claude-sonnet-4-6', (10, 40, 30, 20))
+        usage = json.loads(line)['message']['usage']
+        assert probed[2] == (usage['input_tokens'], usage['output_tokens'],
+                             usage['cache_read_input_tokens'], usage['cache_creation_input_tokens'])
+
+    def test_probe_handles_other_usage_key_orders(self):
+        """Test that a usage block in a different key order is still probed per key."""
+        entry = json.loads(_assistant_line())
+        usage = entry['message']['usage']
+        entry['message']['usage'] = {'output_tokens': usage['output_tokens'],
+                                     'cache_read_input_tokens': usage['cache_read_input_tokens'],
+                                     'input_tokens': usage['input_tokens']}
+        line = json.dumps(entry, separators=(',', ':')).encode()
+        assert _probe_usage(line) == ('2026-01-02T03:04:05.000Z', 'claude-sonnet-4-6', (10, 40, 30, 0))
+
+    def test_probe_skips_nested_progress_lines(self):
+        """Test that usage nested under agent progress data is not probed or counted."""
+        inner = json.loads(_assistant_line())
+        line = json.dumps({'type': 'progress', 'data': {'message': inner}}, separators=(',', ':')).encode()
+        assert _probe_usage(line) is None
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'progress', [line])
+            summary = _summarize_jsonl(path, os.path.getmtime(path), os.path.getsize(path))
+        assert summary['models'] == {}
+
+    def test_truncated_record_is_not_probed(self):
+        """Test that a cut-off record glued to the next one is skipped like invalid JSON."""
+        line = b'{"parentUuid":"x","isSidechain":false,"t' + _assistant_line()
+        assert _probe_usage(line) is None
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'crash', [line, _assistant_line()])
+            summary = _summarize_jsonl(path, os.path.getmtime(path), os.path.getsize(path))
+            _FILE_CACHE.pop(path, None)
+        assert summary['msg_count'] == 1
+        assert summary['models']['claude-sonnet-4-6'][1] == 40
+
+    def test_long_lines_skip_the_probe(self):
+        """Test that lines dominated by tool payload go straight to json.loads."""
+        import server
+        line = _assistant_line().replace(b'hello', b'x' * server._PROBE_MAX_LEN)
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'long', [line])
+            with patch.object(server, '_probe_usage', side_effect=AssertionError('probed')):
+                summary = _summarize_jsonl(path, os.path.getmtime(path), os.path.getsize(path))
+            _FILE_CACHE.pop(path, None)
+        assert summary['models']['claude-sonnet-4-6'] == [10, 40, 30, 20]
+
+    def test_non_compact_line_falls_back(self):
+        """Test that lines the probe can't handle are fully parsed instead."""
+        line = json.dumps(json.loads(_assistant_line())).encode()
+        assert _probe_usage(line) is None
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'spaced', [line])
+            summary = _summarize_jsonl(path, os.path.getmtime(path), os.path.getsize(path))
+        assert summary['models']['claude-sonnet-4-6'] == [10, 40, 30, 20]
+        assert summary['msg_count'] == 1
+
+
+class TestListJsonl:
+    """Tests for the cached session file walk."""
+
+    def test_lists_only_jsonl_files(self):
+        """Test that only *.jsonl files inside project folders are returned."""
+        with _claude_home() as projects:
+            path = _write_session(projects, '-home-user-proj', 'abc', [b'{}'])
+            _write_session(projects, '-home-user-proj', '.hidden', [b'{}'])
+            with open(os.path.join(projects, '-home-user-proj', 'notes.txt'), 'w') as f:
+                f.write('x')
+            with open(os.path.join(projects, 'stray.jsonl'), 'w') as f:
+                f.write('{}')
+            files = _list_jsonl(projects)
+            assert files == [('-home-user-proj', path, os.path.getmtime(path), os.path.getsize(path))]
+
+    def test_walk_is_cached_within_ttl(self):
+        """Test that back-to-back calls share one walk until the TTL expires."""
+        with _claude_home() as projects:
+            _write_session(projects, '-home-user-proj', 'one', [b'{}'])
+            with patch('time.monotonic', return_value=1000.0):
+                assert len(_list_jsonl(projects)) == 1
+                _write_session(projects, '-home-user-proj', 'two', [b'{}'])
+                assert len(_list_jsonl(projects)) == 1
+            with patch('time.monotonic', return_value=1010.0):
+                assert len(_list_jsonl(projects)) == 2
+            _WALK_CACHE.pop(projects, None)
+
+
+class TestSummarizeJsonl:
+    """Tests for the per-file incremental parse cache."""
+
+    def _summarize(self, path):
+        return _summarize_jsonl(path, os.path.getmtime(path), os.path.getsize(path))
+
+    def test_unchanged_file_is_not_reread(self):
+        """Test that a file with the same mtime and size is served from the cache."""
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', [_assistant_line()])
+            first = self._summarize(path)
+            with patch('builtins.open', side_effect=AssertionError('re-read')):
+                assert self._summarize(path) is first
+            _FILE_CACHE.pop(path, None)
+
+    def test_appended_lines_parse_from_offset(self):
+        """Test that only bytes appended since the last parse are read."""
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', [_assistant_line()])
+            first = self._summarize(path)
+            assert first['offset'] == os.path.getsize(path)
+            with open(path, 'ab') as f:
+                f.write(_assistant_line(output_tokens=2) + b'\n')
+            second = self._summarize(path)
+            _FILE_CACHE.pop(path, None)
+        assert first['models']['claude-sonnet-4-6'][1] == 40
+        assert second['models']['claude-sonnet-4-6'][1] == 42
+        assert second['msg_count'] == 2
+        assert second['offset'] == second['size']
+
+    def test_primary_model_follows_appends(self):
+        """Test that the leading model is tracked across incremental parses."""
+        opus = _assistant_line(output_tokens=100).replace(b'claude-sonnet-4-6', b'claude-opus-4-6')
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', [_assistant_line(), opus])
+            first = self._summarize(path)
+            with open(path, 'ab') as f:
+                f.write(_assistant_line(output_tokens=200) + b'\n')
+            second = self._summarize(path)
+            _FILE_CACHE.pop(path, None)
+        assert first['primary_model'] == 'claude-opus-4-6'
+        assert second['primary_model'] == 'claude-sonnet-4-6'
+        assert second['primary_total'] == 10 + 40 + 10 + 200
+
+    def test_partial_tail_waits_for_completion(self):
+        """Test that a half-written last line is picked up once it is complete."""
+        line = _assistant_line()
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', [line])
+            with open(path, 'ab') as f:
+                f.write(line[:20])
+            first = self._summarize(path)
+            with open(path, 'ab') as f:
+                f.write(line[20:] + b'\n')
+            second = self._summarize(path)
+            _FILE_CACHE.pop(path, None)
+        assert first['msg_count'] == 1
+        assert first['offset'] == len(line) + 1
+        assert second['msg_count'] == 2
+
+    def test_records_spanning_read_chunks(self):
+        """Test that lines split across read chunks are reassembled."""
+        lines = [_assistant_line(output_tokens=n) for n in (1, 2, 3)]
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', lines)
+            with patch('server._READ_CHUNK', 7):
+                summary = self._summarize(path)
+            _FILE_CACHE.pop(path, None)
+        assert summary['msg_count'] == 3
+        assert summary['models']['claude-sonnet-4-6'][1] == 6
+        assert summary['offset'] == summary['size']
+
+    def test_lines_without_needed_fields_are_not_parsed(self):
+        """Test that the byte pre-filter skips lines that can't contribute."""
+        lines = [
+            b'{"type":"summary","summary":"x","leafUuid":"y"}',
+            b'{"type":"system","toolUseResult":{"usage":{"input_tokens":5}}}',
+        ]
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', lines)
+            with patch('server.json.loads', side_effect=AssertionError('parsed')):
+                summary = self._summarize(path)
+            _FILE_CACHE.pop(path, None)
+        assert summary['msg_count'] == 0
+        assert summary['models'] == {}
+
+    def test_parallel_prefetch_matches_serial_parse(self):
+        """Test that summaries built in worker processes match a serial parse."""
+        with _claude_home() as projects:
+            paths = [_write_session(projects, '-proj', str(n), [_assistant_line(output_tokens=n)])
+                     for n in range(3)]
+            files = [('-proj', p, os.path.getmtime(p), os.path.getsize(p)) for p in paths]
+            with patch('server._PARALLEL_MIN_FILES', 2), patch('os.cpu_count', return_value=2):
+                _prefetch_summaries(files)
+            for _, path, mtime, size in files:
+                assert _FILE_CACHE.pop(path) == _parse_jsonl(path, mtime, size)
+
+    def test_truncated_file_is_reparsed(self):
+        """Test that a file that shrank is summarized from scratch."""
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', [_assistant_line(), _assistant_line()])
+            self._summarize(path)
+            _write_session(projects, '-proj', 'a', [_assistant_line()])
+            summary = self._summarize(path)
+            _FILE_CACHE.pop(path, None)
+        assert summary['msg_count'] == 1
+        assert summary['models']['claude-sonnet-4-6'][1] == 40
+
+    def test_non_object_record_skips_only_that_line(self):
+        """Test that valid JSON that isn't an object is ignored without dropping the file."""
+        with _claude_home() as projects:
+            path = _write_session(projects, '-proj', 'a', [_assistant_line(), b'[1,2,"usage"]', _assistant_line()])
+            summary = self._summarize(path)
+            _FILE_CACHE.pop(path, None)
+        assert summary['msg_count'] == 2
+        assert summary['models']['claude-sonnet-4-6'][1] == 80
+
+    def test_prune_tolerates_concurrent_inserts(self):
+        """Test that pruning while another request thread caches files doesn't raise."""
+        prefix = os.path.join(os.sep, 'prune-test')
+        stop = threading.Event()
+
+        def insert():
+            i = 0
+            while not stop.is_set():
+                _FILE_CACHE[os.path.join(prefix, 'new-%d.jsonl' % i)] = {}
+                i += 1
+
+        live = [('-proj', os.path.join(prefix, 'old-%d.jsonl' % i), 0, 0) for i in range(20000)]
+        for f in live:
+            _FILE_CACHE[f[1]] = {}
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        writer = threading.Thread(target=insert)
+        writer.start()
+        try:
+            for _ in range(50):
+                _prune_file_cache(prefix, live)
+        finally:
+            stop.set()
+            writer.join()
+            sys.setswitchinterval(interval)
+            for path in [p for p in list(_FILE_CACHE) if p.startswith(prefix + os.sep)]:
+                del _FILE_CACHE[path]
+
+
 class TestComputeUsage:
     """Tests for compute_usage() function."""
 
@@ -118,31 +419,15 @@ class TestComputeUsage:
             assert result['totalEstimatedCost'] == 0
             assert result['totalSessions'] == 0
 
-    @patch('os.path.isdir')
-    @patch('os.listdir')
-    def test_empty_projects_dir(self, mock_listdir, mock_isdir):
+    def test_empty_projects_dir(self):
         """Test when projects directory is empty."""
-        mock_isdir.return_value = True
-        mock_listdir.return_value = []
-        result = compute_usage(7)
+        with _claude_home():
+            result = compute_usage(7)
         assert result['byModel'] == {}
         assert result['byDay'] == []
 
-    @patch('os.path.isdir')
-    @patch('os.listdir')
-    @patch('glob.glob')
-    @patch('builtins.open', MagicMock())
-    @patch('os.path.getmtime')
-    def test_parses_session_file(self, mock_mtime, mock_glob, mock_listdir, mock_isdir):
+    def test_parses_session_file(self):
         """Test parsing a session JSONL file."""
-        mock_isdir.return_value = True
-        mock_listdir.return_value = ['-home-user-testproject']
-        mock_glob.return_value = ['/home/user/.claude/projects/-home-user-testproject/session.jsonl']
-
-        # Mock file mtime to be recent
-        mock_mtime.return_value = datetime.now().timestamp()
-
-        # Mock file content
         session_data = {
             'timestamp': datetime.now().isoformat(),
             'model': 'claude-sonnet-4-6',
@@ -157,12 +442,8 @@ class TestComputeUsage:
             }
         }
 
-        mock_file = MagicMock()
-        mock_file.__enter__ = MagicMock(return_value=mock_file)
-        mock_file.__exit__ = MagicMock(return_value=False)
-        mock_file.__iter__ = MagicMock(return_value=iter([json.dumps(session_data)]))
-
-        with patch('builtins.open', return_value=mock_file):
+        with _claude_home() as projects:
+            _write_session(projects, '-home-user-testproject', 'session', [json.dumps(session_data).encode()])
             result = compute_usage(7)
 
         # Should have parsed the usage
@@ -171,6 +452,20 @@ class TestComputeUsage:
         assert model_usage['input'] == 1000
         assert model_usage['output'] == 500
 
+    def test_cost_uses_model_totals(self):
+        """Net input is clamped on the model totals, not per entry."""
+        with _claude_home() as projects:
+            _write_session(projects, '-tmp-proj', 'abc', [
+                _assistant_line(input_tokens=1000, cache_read_input_tokens=0, cache_creation_input_tokens=0),
+                _assistant_line(input_tokens=0, cache_read_input_tokens=500, cache_creation_input_tokens=0),
+            ])
+            result = compute_usage(3650)
+        usage = result['byModel']['claude-sonnet-4-6']
+        assert usage['input'] == 1000
+        assert usage['cacheRead'] == 500
+        assert usage['estimatedCost'] == round(_cost('claude-sonnet-4-6', usage), 4)
+        assert result['totalEstimatedCost'] == round(usage['estimatedCost'], 2)
+
 
 class TestComputeSessions:
     """Tests for compute_sessions() function."""
@@ -182,15 +477,50 @@ class TestComputeSessions:
             assert result['sessions'] == []
             assert result['total'] == 0
 
-    @patch('os.path.isdir')
-    @patch('os.listdir')
-    def test_empty_projects_dir(self, mock_listdir, mock_isdir):
+    def test_empty_projects_dir(self):
         """Test when projects directory is empty."""
-        mock_isdir.return_value = True
-        mock_listdir.return_value = []
-        result = compute_sessions(7)
+        with _claude_home():
+            result = compute_sessions(7)
         assert result['sessions'] == []
 
+    def test_shares_pass_with_usage(self):
+        """Usage and sessions for the same window come from one walk over the files."""
+        import server
+        with _claude_home() as projects:
+            _write_session(projects, '-tmp-proj', 'abc', [_assistant_line()])
+            with patch.object(server, '_summarize_jsonl', wraps=server._summarize_jsonl) as summarize:
+                usage = compute_usage(3650)
+                result = compute_sessions(3650, limit=1)
+            assert summarize.call_count == 1
+        assert usage['byModel']['claude-sonnet-4-6']['output'] == 40
+        assert result['total'] == 1
+        [row] = result['sessions']
+        assert row['sessionId'] == 'abc'
+        assert row['totalOutput'] == 40
+
+    def test_shared_pass_sees_appended_lines(self):
+        """Test that the shared pass is recomputed once the session tree changes."""
+        with _claude_home() as projects:
+            path = _write_session(projects, '-tmp-proj', 'abc', [_assistant_line()])
+            assert compute_sessions(3650)['sessions'][0]['totalOutput'] == 40
+            with open(path, 'ab') as f:
+                f.write(_assistant_line(output_tokens=2) + b'\n')
+            _WALK_CACHE.pop(projects, None)
+            assert compute_sessions(3650)['sessions'][0]['totalOutput'] == 42
+            _WALK_CACHE.pop(projects, None)
+            _FILE_CACHE.pop(path, None)
+
+    def test_limit_keeps_newest_sessions(self):
+        """Test that limit returns the most recently modified sessions, newest first."""
+        now = datetime.now().timestamp()
+        with _claude_home() as projects:
+            for age, name in ((300, 'old'), (100, 'new'), (200, 'mid')):
+                path = _write_session(projects, '-tmp-proj', name, [_assistant_line()])
+                os.utime(path, (now - age, now - age))
+            result = compute_sessions(3650, limit=2)
+        assert [s['sessionId'] for s in result['sessions']] == ['new', 'mid']
+        assert result['total'] == 3
+
 
 class TestModelPricing:
     """Tests for MODEL_PRICING configuration."""
@@ -218,18 +548,25 @@ class TestModelPricing:
         assert 'claude-opus-4-6' in MODEL_PRICING
         assert 'claude-haiku-4-5-20251001' in MODEL_PRICING
 
+    def test_rate_rows_match_pricing(self):
+        """Test that precomputed rate rows mirror MODEL_PRICING field order."""
+        assert set(_RATES_BY_MODEL) == set(MODEL_PRICING)
+        for model, pricing in MODEL_PRICING.items():
+            assert _RATES_BY_MODEL[model] == (
+                pricing['input'], pricing['output'], pricing['cacheRead'], pricing['cacheWrite'])
+        assert _DEFAULT_RATES == (
+            DEFAULT_PRICING['input'], DEFAULT_PRICING['output'],
+            DEFAULT_PRICING['cacheRead'], DEFAULT_PRICING['cacheWrite'])
+
 
 class TestComputeUsageComparison:
     """Tests for compute_usage_comparison() function."""
 
-    @patch('os.path.isdir')
-    @patch('os.listdir')
-    def test_comparison_returns_change_percent(self, mock_listdir, mock_isdir):
+    def test_comparison_returns_change_percent(self):
         """Test that comparison includes change percent."""
         from server import compute_usage_comparison
-        mock_isdir.return_value = True
-        mock_listdir.return_value = []
-        result = compute_usage_comparison(7)
+        with _claude_home():
+            result = compute_usage_comparison(7)
         assert 'changePercent' in result
         assert 'previousCost' in result
 
@@ -237,14 +574,11 @@ class TestComputeUsageComparison:
 class TestComputeUsageWithOffset:
     """Tests for compute_usage_with_offset() function."""
 
-    @patch('os.path.isdir')
-    @patch('os.listdir')
-    def test_offset_returns_data(self, mock_listdir, mock_isdir):
+    def test_offset_returns_data(self):
         """Test that offset function returns usage data."""
         from server import compute_usage_with_offset
-        mock_isdir.return_value = True
-        mock_listdir.return_value = []
-        result = compute_usage_with_offset(7, 7)
+        with _claude_home():
+            result = compute_usage_with_offset(7, 7)
         assert 'byModel' in result
         assert 'byDay' in result
         assert 'totalEstimatedCost' in result
@@ -254,19 +588,59 @@ class TestComputeUsageWithOffset:
 class TestComputeHourlyActivity:
     """Tests for compute_hourly_activity() function."""
 
-    @patch('os.path.isdir')
-    @patch('os.listdir')
-    def test_hourly_returns_data(self, mock_listdir, mock_isdir):
+    def test_hourly_returns_data(self):
         """Test that hourly activity returns proper structure."""
         from server import compute_hourly_activity
-        mock_isdir.return_value = True
-        mock_listdir.return_value = []
-        result = compute_hourly_activity(7)
+        with _claude_home():
+            result = compute_hourly_activity(7)
         assert 'byHour' in result
         assert 'byDayOfWeek' in result
         assert len(result['byHour']) == 24
         assert len(result['byDayOfWeek']) == 7
 
 
+class TestJsonResponse:
+    """Tests for Handler._json()."""
+
+    def test_writes_compact_body_with_headers(self):
+        """Test that responses are compact JSON with CORS and length headers."""
+        handler = Handler.__new__(Handler)
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+        handler.wfile = MagicMock()
+        handler._json({'ok': True, 'days': [1, 2]})
+
+        body = handler.wfile.write.call_args[0][0]
+        assert body == b'{"ok":true,"days":[1,2]}'
+        headers = dict(call[0] for call in handler.send_header.call_args_list)
+        assert headers['Content-Type'] == 'application/json'
+        assert headers['Access-Control-Allow-Origin'] == '*'
+        assert headers['Content-Length'] == str(len(body))
+
+
+class TestResponseCache:
+    """Tests for _cached_response()."""
+
+    def test_body_reused_until_tree_changes(self):
+        """Test that a response is recomputed only after a session file changes."""
+        compute = MagicMock(return_value={'n': 1})
+        compute.__name__ = 'compute_stub'
+        with _claude_home() as projects:
+            _write_session(projects, '-proj', 'a', [_assistant_line()])
+            assert _cached_response(compute, 7) == b'{"n":1}'
+            assert _cached_response(compute, 7) == b'{"n":1}'
+            assert compute.call_count == 1
+
+            _cached_response(compute, 30)
+            assert compute.call_count == 2
+
+            _write_session(projects, '-proj', 'b', [_assistant_line()])
+            _WALK_CACHE.pop(projects, None)
+            _cached_response(compute, 7)
+            assert compute.call_count == 3
+            _WALK_CACHE.pop(projects, None)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])